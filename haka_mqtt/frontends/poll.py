@@ -172,20 +172,43 @@ class MqttPollClient(Reactor):
         Reactor.__init__(self, p, log=log)
 
     def poll(self, period=0.):
-        poll_end_time = self._clock.time() + period
+        """Services socket I/O and scheduler deadlines for `period`
+        seconds or until the reactor becomes inactive, whichever comes
+        first.
+
+        Parameters
+        ----------
+        period: float or None
+            Maximum number of seconds to poll for.  If `None` then polls
+            until the reactor becomes inactive; the process is then only
+            woken by socket readiness or by the next scheduler deadline.
+        """
+        if period is None:
+            if self.state not in ACTIVE_STATES:
+                # Nothing would ever wake the select call.
+                return
+
+            poll_end_time = None
+        else:
+            poll_end_time = self._clock.time() + period
 
         while True:
             select_timeout = self._scheduler.remaining()
-            if select_timeout is None or self._clock.time() + select_timeout > poll_end_time:
-                select_timeout = poll_end_time - self._clock.time()
+            if poll_end_time is not None:
+                if select_timeout is None or self._clock.time() + select_timeout > poll_end_time:
+                    select_timeout = poll_end_time - self._clock.time()
 
-            if select_timeout < 0.:
+            # A deadline that is already overdue yields a negative
+            # timeout which select rejects.
+            if select_timeout is not None and select_timeout < 0.:
                 select_timeout = 0
 
             self._selector.select(select_timeout)
             self._scheduler.poll()
 
-            if self._clock.time() > poll_end_time or self.state not in ACTIVE_STATES:
+            if poll_end_time is not None and self._clock.time() > poll_end_time:
+                break
+            elif self.state not in ACTIVE_STATES:
                 break
 
 
@@ -65,10 +65,11 @@ class MqttPublishTicket(MqttRequest):
         assert isinstance(retain, bool)
         assert isinstance(payload, bytes)
 
-        self.topic = topic
-        self.payload = payload
-        self.qos = qos
-        self.retain = retain
+        self.__packet = None
+        self.__topic = topic
+        self.__payload = payload
+        self.__qos = qos
+        self.__retain = retain
         self.__dupe = False
 
         if qos == 0:
@@ -78,6 +79,70 @@ class MqttPublishTicket(MqttRequest):
 
         self.__status = MqttPublishStatus.preflight
 
+    @property
+    def topic(self):
+        """
+
+        Returns
+        -------
+        str
+        """
+        return self.__topic
+
+    @topic.setter
+    def topic(self, topic):
+        self.__topic = topic
+        self.__packet = None
+
+    @property
+    def payload(self):
+        """
+
+        Returns
+        -------
+        bytes
+        """
+        return self.__payload
+
+    @payload.setter
+    def payload(self, payload):
+        assert isinstance(payload, bytes)
+        self.__payload = payload
+        self.__packet = None
+
+    @property
+    def qos(self):
+        """
+
+        Returns
+        -------
+        int
+            0 <= self.qos <= 2
+        """
+        return self.__qos
+
+    @qos.setter
+    def qos(self, qos):
+        assert 0 <= qos <= 2
+        self.__qos = qos
+        self.__packet = None
+
+    @property
+    def retain(self):
+        """
+
+        Returns
+        -------
+        bool
+        """
+        return self.__retain
+
+    @retain.setter
+    def retain(self, retain):
+        assert isinstance(retain, bool)
+        self.__retain = retain
+        self.__packet = None
+
     @property
     def dupe(self):
         """
@@ -90,6 +155,7 @@ class MqttPublishTicket(MqttRequest):
 
     def _set_dupe(self):
         self.__dupe = True
+        self.__packet = None
 
     def _set_status(self, s):
         """
@@ -120,7 +186,13 @@ class MqttPublishTicket(MqttRequest):
         return self.__status
 
     def packet(self):
-        return MqttPublish(self.packet_id, self.topic, self.payload, self.dupe, self.qos, self.retain)
+        # Constructing a packet encodes its body to compute the
+        # remaining length so the packet is built once and reused until
+        # a packet field or the dupe flag changes.
+        if self.__packet is None:
+            self.__packet = MqttPublish(self.packet_id, self.topic, self.payload, self.dupe, self.qos, self.retain)
+
+        return self.__packet
 
     def encode(self, f):
         return self.packet().encode(f)
@@ -181,6 +253,7 @@ class MqttSubscribeTicket(MqttRequest):
             raise TypeError()
         assert len(topics) >= 1  # MQTT 3.8.3-3
         self.__status = MqttSubscribeStatus.preflight
+        self.__packet = None
 
     @property
     def topics(self):
@@ -207,7 +280,10 @@ class MqttSubscribeTicket(MqttRequest):
         return self.__status
 
     def packet(self):
-        return MqttSubscribe(self.packet_id, self.topics)
+        if self.__packet is None:
+            self.__packet = MqttSubscribe(self.packet_id, self.topics)
+
+        return self.__packet
 
     def encode(self, f):
         return self.packet().encode(f)
@@ -239,6 +315,7 @@ class MqttUnsubscribeTicket(MqttRequest):
 
         assert len(topics) >= 1  # MQTT 3.10.3-2
         self.__status = MqttSubscribeStatus.preflight
+        self.__packet = None
 
     def _set_status(self, s):
         """
@@ -263,7 +340,10 @@ class MqttUnsubscribeTicket(MqttRequest):
         return self.packet().encode(f)
 
     def packet(self):
-        return MqttUnsubscribe(self.packet_id, self.topics)
+        if self.__packet is None:
+            self.__packet = MqttUnsubscribe(self.packet_id, self.topics)
+
+        return self.__packet
 
     def __eq__(self, other):
         return (
@@ -19,3 +19,6 @@ class NullLogger(object):
 
     def exception(self, msg, *args, **kwargs):
         pass
+
+    def isEnabledFor(self, lvl):
+        return False
@@ -9,7 +9,6 @@ import socket
 import logging
 import ssl
 from collections import OrderedDict
-from io import BytesIO
 import os
 
 from enum import (
@@ -231,6 +230,35 @@ ACTIVE_STATES = (
 assert set(INACTIVE_STATES).union(ACTIVE_STATES) == set(iter(ReactorState))
 
 
+# An MQTT fixed header is one byte of packet type and flags followed by
+# a remaining length varint of at most four bytes.
+#
+MAX_FIXED_HEADER_LEN = 5
+
+
+# Initial size of the receive buffer placed under `socket.recv_into`.
+# The buffer grows when it must hold a packet larger than this and
+# shrinks back once that packet has been consumed.
+#
+RECV_BUF_SIZE = 2**16
+
+
+# Maximum number of `socket.recv_into` calls made by a single
+# `Reactor.read` call while draining the socket.  Bounds the time spent
+# in one read so that writes and deadlines are not starved by a peer
+# that sends continuously.
+#
+RECV_DRAIN_LIMIT = 16
+
+
+# Pingreq and disconnect packets have no variable fields and codec
+# packets are immutable so a single instance of each is shared rather
+# than constructing (and sizing) a new packet on every keepalive.
+#
+_PINGREQ = MqttPingreq()
+_DISCONNECT = MqttDisconnect()
+
+
 class ReactorError(object):
     def __repr__(self):
         return '{}()'.format(self.__class__.__name__)
@@ -412,6 +440,23 @@ class _AssertSelectAdapter(object):
                 self.__selector.del_read(f, self.__reactor)
 
 
+class _BytearrayWriter(object):
+    """A minimal file-like object that appends everything written to it
+    to the end of a bytearray.  Lets packets be encoded directly into
+    the reactor write buffer.
+
+    Parameters
+    ----------
+    buf: bytearray
+    """
+    def __init__(self, buf):
+        self.__buf = buf
+
+    def write(self, b):
+        self.__buf.extend(b)
+        return len(b)
+
+
 class Reactor(object):
     """
     Parameters
@@ -421,7 +466,7 @@ class Reactor(object):
         If `str` then the result of logging.getLogger(log) is used as a
         logger; otherwise assumes that is a `logging.Logger`-like
         object and asserts that it has `debug`, `info`, `warning`,
-        `error`, and `critical` methods.  If `log` is `None` then
+        `error`, `critical`, and `isEnabledFor` methods.  If `log` is `None` then
         logging is disabled.
     """
     def __init__(self, properties, log='haka'):
@@ -454,10 +499,12 @@ class Reactor(object):
             assert hasattr(log, 'warning')
             assert hasattr(log, 'error')
             assert hasattr(log, 'critical')
+            assert hasattr(log, 'isEnabledFor')
             self.__log = log
 
         self.__wbuf = bytearray()
         self.__rbuf = bytearray()
+        self.__rbuf_len = 0
 
         self.__address_family = properties.address_family
         self.__ssl_want_read = False
@@ -521,6 +568,21 @@ class Reactor(object):
         # Want read
         self.__selector = _AssertSelectAdapter(self, properties.selector)
 
+        # Received packets are dispatched through a table indexed by
+        # packet type.  Entries are (packet_class, handler) for packets
+        # a server may send to a client and None for all others.
+        recv_handlers = [None] * 16
+        recv_handlers[MqttControlPacketType.connack] = (MqttConnack, self.__on_connack)
+        recv_handlers[MqttControlPacketType.suback] = (MqttSuback, self.__on_suback)
+        recv_handlers[MqttControlPacketType.unsuback] = (MqttUnsuback, self.__on_unsuback)
+        recv_handlers[MqttControlPacketType.puback] = (MqttPuback, self.__on_puback)
+        recv_handlers[MqttControlPacketType.publish] = (MqttPublish, self.__on_publish)
+        recv_handlers[MqttControlPacketType.pingresp] = (MqttPingresp, self.__on_pingresp)
+        recv_handlers[MqttControlPacketType.pubrel] = (MqttPubrel, self.__on_pubrel)
+        recv_handlers[MqttControlPacketType.pubcomp] = (MqttPubcomp, self.__on_pubcomp)
+        recv_handlers[MqttControlPacketType.pubrec] = (MqttPubrec, self.__on_pubrec)
+        self.__recv_handlers = tuple(recv_handlers)
+
     # Connection Callbacks
     def on_connect_fail(self, reactor):
         """
@@ -1035,7 +1097,8 @@ class Reactor(object):
         self.__preflight_queue = preflight_queue
 
         self.__wbuf = bytearray()
-        self.__rbuf = bytearray()
+        self.__rbuf = bytearray(RECV_BUF_SIZE)
+        self.__rbuf_len = 0
 
         self.__state = ReactorState.starting
         self.__sock_state = SocketState.name_resolution
@@ -1200,7 +1263,7 @@ class Reactor(object):
                 self.__terminate(ReactorState.stopped, None)
             else:
                 self.__state = ReactorState.stopping
-                self.__preflight_queue.append(MqttDisconnect())
+                self.__preflight_queue.append(_DISCONNECT)
         elif self.state is ReactorState.stopping:
             self.__log.warning('Stop while already stopping.')
         elif self.state is ReactorState.stopped:
@@ -1274,18 +1337,21 @@ class Reactor(object):
 
         return rv
 
-    def __decode_packet_body(self, header, num_header_bytes, packet_class):
-        num_packet_bytes = num_header_bytes + header.remaining_len
-
-        body = self.__rbuf[num_header_bytes:num_packet_bytes]
+    def __decode_packet_body(self, header, body, packet_class):
         num_body_bytes_consumed, packet = packet_class.decode_body(header, BytesReader(body))
-        assert num_packet_bytes == num_header_bytes + num_body_bytes_consumed
-        self.__rbuf = bytearray(self.__rbuf[num_packet_bytes:])
+        assert header.remaining_len == num_body_bytes_consumed
         return packet
 
-    def __on_recv_bytes(self, new_bytes):
+    def __on_recv_bytes(self, num_new_bytes):
+        """Called after `socket.recv_into` has placed `num_new_bytes`
+        bytes into ``self.__rbuf`` just past ``self.__rbuf_len``.
+
+        Parameters
+        ----------
+        num_new_bytes: int
+        """
         assert self.sock_state in (SocketState.connected, SocketState.mute)
-        assert len(new_bytes) > 0
+        assert num_new_bytes > 0
 
         if self.sock_state is not SocketState.mute:
             if self.__recv_idle_ping_deadline is not None:
@@ -1299,41 +1365,107 @@ class Reactor(object):
         self.__recv_idle_abort_deadline = self.__scheduler.add(self.__recv_idle_abort_period,
                                                                self.__recv_idle_abort_timeout)
 
-        self.__log.debug('recv %d bytes 0x%s', len(new_bytes), HexOnStr(new_bytes))
-        self.__rbuf.extend(new_bytes)
-
-        while True:
-            num_header_bytes, header = MqttFixedHeader.decode(BytesReader(bytes(self.__rbuf)))
-            num_packet_bytes = num_header_bytes + header.remaining_len
-            if len(self.__rbuf) >= num_packet_bytes:
-                if header.packet_type == MqttControlPacketType.connack:
-                    self.__on_connack(self.__decode_packet_body(header, num_header_bytes, MqttConnack))
-                elif header.packet_type == MqttControlPacketType.suback:
-                    self.__on_suback(self.__decode_packet_body(header, num_header_bytes, MqttSuback))
-                elif header.packet_type == MqttControlPacketType.unsuback:
-                    self.__on_unsuback(self.__decode_packet_body(header, num_header_bytes, MqttUnsuback))
-                elif header.packet_type == MqttControlPacketType.puback:
-                    self.__on_puback(self.__decode_packet_body(header, num_header_bytes, MqttPuback))
-                elif header.packet_type == MqttControlPacketType.publish:
-                    self.__on_publish(self.__decode_packet_body(header, num_header_bytes, MqttPublish))
-                elif header.packet_type == MqttControlPacketType.pingresp:
-                    self.__on_pingresp(self.__decode_packet_body(header, num_header_bytes, MqttPingresp))
-                elif header.packet_type == MqttControlPacketType.pubrel:
-                    self.__on_pubrel(self.__decode_packet_body(header, num_header_bytes, MqttPubrel))
-                elif header.packet_type == MqttControlPacketType.pubcomp:
-                    self.__on_pubcomp(self.__decode_packet_body(header, num_header_bytes, MqttPubcomp))
-                elif header.packet_type == MqttControlPacketType.pubrec:
-                    self.__on_pubrec(self.__decode_packet_body(header, num_header_bytes, MqttPubrec))
-                else:
+        rbuf = self.__rbuf
+        rbuf_len = self.__rbuf_len + num_new_bytes
+        if self.__log.isEnabledFor(logging.DEBUG):
+            # The slice is a copy so the logged bytes stay correct for
+            # handlers that format records after the receive buffer has
+            # been reused.
+            self.__log.debug('recv %d bytes 0x%s', num_new_bytes, HexOnStr(rbuf[self.__rbuf_len:rbuf_len]))
+        self.__rbuf_len = rbuf_len
+
+        # Packets are decoded in place by offset and the consumed bytes
+        # are moved out of the front of the buffer once all complete
+        # packets have been handled.  A packet callback that aborts or
+        # restarts the reactor replaces `self.__rbuf`; decoding stops
+        # when that happens.
+        num_bytes_consumed = 0
+        num_bytes_required = 0
+        try:
+            while rbuf is self.__rbuf:
+                header_end = min(num_bytes_consumed + MAX_FIXED_HEADER_LEN, rbuf_len)
+                try:
+                    num_header_bytes, header = MqttFixedHeader.decode(BytesReader(rbuf[num_bytes_consumed:header_end]))
+                except UnderflowDecodeError:
+                    # Not enough header bytes.
+                    break
+
+                if num_header_bytes > 2 and rbuf[num_bytes_consumed + num_header_bytes - 1] == 0:
+                    # A trailing zero continuation byte means the
+                    # remaining length could have been encoded in fewer
+                    # bytes.
+                    raise DecodeError('Non-minimal remaining-length encoding.')
+
+                body_start = num_bytes_consumed + num_header_bytes
+                body_end = body_start + header.remaining_len
+                if rbuf_len < body_end:
+                    # Packet body has not been completely received.
+                    num_bytes_required = body_end - num_bytes_consumed
+                    break
+
+                body = rbuf[body_start:body_end]
+                num_bytes_consumed = body_end
+
+                recv_handler = self.__recv_handlers[header.packet_type]
+                if recv_handler is None:
                     m = 'Received unsupported message type {}.'.format(header.packet_type)
                     self.__log.error(m)
                     self.__abort(DecodeReactorError(m))
+                else:
+                    packet_class, on_packet = recv_handler
+                    on_packet(self.__decode_packet_body(header, body, packet_class))
+        finally:
+            if rbuf is self.__rbuf:
+                self.__compact_rbuf(num_bytes_consumed, num_bytes_required)
+
+    def __compact_rbuf(self, num_bytes_consumed, num_bytes_required):
+        """Moves the unconsumed tail of ``self.__rbuf`` to the front of
+        the buffer.  When the tail fills the buffer and is part of a
+        packet that does not fit, the buffer size is doubled (up to
+        `num_bytes_required` bytes).
+
+        Parameters
+        ----------
+        num_bytes_consumed: int
+            Number of bytes at the front of the buffer that have been
+            decoded.
+        num_bytes_required: int
+            Number of bytes needed to hold the next incomplete packet.
+        """
+        rbuf = self.__rbuf
+        num_bytes_remaining = self.__rbuf_len - num_bytes_consumed
+
+        if num_bytes_remaining == len(rbuf) and len(rbuf) < num_bytes_required:
+            # The required size comes from the peer's remaining length
+            # field; growing only as data arrives keeps a bogus length
+            # from allocating memory for bytes that were never sent.
+            rbuf_size = min(num_bytes_required, 2 * len(rbuf))
+        elif len(rbuf) > RECV_BUF_SIZE and num_bytes_required <= RECV_BUF_SIZE:
+            rbuf_size = RECV_BUF_SIZE
+        else:
+            rbuf_size = len(rbuf)
+
+        if rbuf_size != len(rbuf):
+            # The buffer is replaced rather than resized in place
+            # because a bytearray cannot be resized while a memoryview
+            # of it is still referenced.
+            self.__rbuf = bytearray(rbuf_size)
+
+        if num_bytes_remaining and (num_bytes_consumed or self.__rbuf is not rbuf):
+            self.__rbuf[0:num_bytes_remaining] = rbuf[num_bytes_consumed:self.__rbuf_len]
+        self.__rbuf_len = num_bytes_remaining
 
     def read(self):
-        """Calls recv on underlying socket exactly once and returns the
-        number of bytes read.  If the underlying socket does not return
-        any bytes due to an error or exception then zero is returned and
-        the reactor state is set to error.
+        """Calls recv_into on underlying socket until it returns fewer
+        bytes than requested or raises an exception (such as
+        EWOULDBLOCK), but no more than :const:`RECV_DRAIN_LIMIT` times,
+        and returns the number of bytes read.  A socket with a timeout
+        (see `socket.settimeout`) is read only once per call since a
+        further recv_into would block until the timeout elapses.
+        Packets are dispatched as soon as they are received.  If the
+        underlying socket does not return any bytes due to an error or
+        exception then zero is returned and the reactor state is set to
+        error.
 
         This method may be called at any time in any state and if `self`
         is not prepared for a read at that point then no action will be
@@ -1360,17 +1492,30 @@ class Reactor(object):
         elif self.sock_state is SocketState.handshake:
             self.__set_handshake()
         elif self.sock_state in (SocketState.connected, SocketState.mute):
-            try:
-                new_bytes = self.socket.recv(4096)
-                num_bytes_read = len(new_bytes)
-                if new_bytes:
-                    self.__on_recv_bytes(new_bytes)
-                else:
-                    self.__on_muted_remote()
+            if self.socket.gettimeout() == 0.:
+                recv_limit = RECV_DRAIN_LIMIT
+            else:
+                recv_limit = 1
 
-            except UnderflowDecodeError:
-                # Not enough header bytes.
-                pass
+            try:
+                for i in range(recv_limit):
+                    num_bytes_free = len(self.__rbuf) - self.__rbuf_len
+                    assert num_bytes_free > 0
+
+                    num_bytes_recvd = self.socket.recv_into(memoryview(self.__rbuf)[self.__rbuf_len:])
+                    num_bytes_read += num_bytes_recvd
+                    if num_bytes_recvd:
+                        self.__on_recv_bytes(num_bytes_recvd)
+                    else:
+                        self.__on_muted_remote()
+
+                    if num_bytes_recvd < num_bytes_free or self.sock_state not in (SocketState.connected,
+                                                                                  SocketState.mute):
+                        # A short read means that the socket receive
+                        # buffer has been drained; calling recv_into
+                        # again would just return EWOULDBLOCK (or block
+                        # on a blocking socket).
+                        break
             except DecodeError as e:
                 self.__log.error('Error decoding message (%s)', str(e))
                 self.__abort(DecodeReactorError(str(e)))
@@ -1749,16 +1894,16 @@ class Reactor(object):
         # packet_end_offset = [1, 4, 7]
         #
         packet_end_offsets = [wbuf_size]
-        bio = BytesIO()
+        wbuf_writer = _BytearrayWriter(self.__wbuf)
         for packet_record in self.__preflight_queue:
-            wbuf_size += packet_record.encode(bio)
+            wbuf_size += packet_record.encode(wbuf_writer)
             packet_end_offsets.append(wbuf_size)
 
             if packet_record.packet_type is MqttControlPacketType.disconnect or wbuf_size >= min_buf_size:
                 break
 
         # Write as many bytes as possible.
-        self.__wbuf.extend(bio.getvalue())
+        assert wbuf_size == len(self.__wbuf)
         num_bytes_flushed = self.__flush()
         assert num_bytes_flushed <= len(self.__wbuf)
 
@@ -2051,6 +2196,7 @@ class Reactor(object):
 
         self.__wbuf = bytearray()
         self.__rbuf = bytearray()
+        self.__rbuf_len = 0
 
         if self.__recv_idle_abort_deadline is not None:
             self.__recv_idle_abort_deadline.cancel()
@@ -2114,7 +2260,7 @@ class Reactor(object):
         if not self.__pingreq_active:
             self.__pingreq_active = True
             self.__pingreq_due = False
-            self.__preflight_queue.append(MqttPingreq())
+            self.__preflight_queue.append(_PINGREQ)
             rv = True
         else:
             rv = False
@@ -31,8 +31,6 @@ class MqttSubClient(MqttPollClient):
         MqttPollClient.__init__(self, properties)
 
         self.__topics = topics
-        self.__req_queue = set()
-        self.__ack_queue = set()
 
         self.__reconnect_period = 10.
         self.__reconnect_deadline = None
@@ -78,7 +76,7 @@ class MqttSubClient(MqttPollClient):
         reactor: Reactor
         p: MqttSuback
         """
-        self.__ack_queue.add(p.packet_id)
+        pass
 
     def on_connack(self, reactor, p):
         """
@@ -88,8 +86,7 @@ class MqttSubClient(MqttPollClient):
         reactor: Reactor
         p: MqttConnack
         """
-        sub_ticket = self.subscribe(self.__topics)
-        self.__req_queue.add(sub_ticket.packet_id)
+        self.subscribe(self.__topics)
 
     def on_publish(self, reactor, p):
         """
@@ -166,8 +163,10 @@ def main(args=sys.argv[1:]):
                            ssl=ns.ssl)
     client.start()
 
+    # Sleeps in select until there is socket activity or a scheduler
+    # deadline comes due rather than waking on a fixed tick.
     while client.state in ACTIVE_STATES:
-        client.poll(5.)
+        client.poll(None)
 
 
 if __name__ == '__main__':
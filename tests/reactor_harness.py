@@ -229,6 +229,8 @@ class TestReactor(unittest.TestCase):
         self.setup_logging()
 
         self.socket = Mock()
+        # Non-blocking socket.
+        self.socket.gettimeout.return_value = 0.
         self.endpoint = ('test.mosquitto.org', 1883)
         self.name_resolver_future = DebugFuture()
         self.name_resolver_future.set_result([
@@ -282,23 +284,51 @@ class TestReactor(unittest.TestCase):
             self.teardown_logging()
 
     def set_recv_side_effect(self, rv_iterable):
-        self.socket.recv.side_effect = rv_iterable
+        """Each call to ``self.socket.recv_into`` takes the next item
+        from `rv_iterable`.  Exceptions are raised and byte strings are
+        copied into the receive buffer.  Like a socket, bytes that do
+        not fit in the buffer are left for the next call.
+
+        Parameters
+        ----------
+        rv_iterable: iterable of bytes or Exception
+        """
+        rv_it = iter(rv_iterable)
+        leftover = []
+
+        def recv_into(buf):
+            if leftover:
+                rv = leftover.pop()
+            else:
+                rv = next(rv_it)
+
+            if isinstance(rv, Exception):
+                raise rv
+
+            if len(rv) > len(buf):
+                leftover.append(rv[len(buf):])
+                rv = rv[0:len(buf)]
+
+            buf[0:len(rv)] = rv
+            return len(rv)
+
+        self.socket.recv_into.side_effect = recv_into
 
     def recv_packet_then_ewouldblock(self, p):
         self.set_recv_side_effect([buffer_packet(p), socket.error(errno.EWOULDBLOCK)])
         self.reactor.read()
-        self.socket.recv.assert_called_once()
-        self.socket.recv.reset_mock()
-        self.socket.recv.side_effect = None
-        self.socket.recv.return_value = None
+        self.socket.recv_into.assert_called_once()
+        self.socket.recv_into.reset_mock()
+        self.socket.recv_into.side_effect = None
+        self.socket.recv_into.return_value = None
 
     def recv_eof(self):
         self.set_recv_side_effect([''])
         self.reactor.read()
-        self.socket.recv.assert_called_once()
-        self.socket.recv.reset_mock()
-        self.socket.recv.side_effect = None
-        self.socket.recv.return_value = None
+        self.socket.recv_into.assert_called_once()
+        self.socket.recv_into.reset_mock()
+        self.socket.recv_into.side_effect = None
+        self.socket.recv_into.return_value = None
 
     def set_send_side_effect(self, rv_iterable):
         self.socket.send.side_effect = rv_iterable
@@ -359,8 +389,8 @@ class TestReactor(unittest.TestCase):
         self.set_send_side_effect([exception])
 
         self.reactor.read()
-        self.socket.recv.assert_called_once()
-        self.socket.recv.reset_mock()
+        self.socket.recv_into.assert_called_once()
+        self.socket.recv_into.reset_mock()
 
     def set_send_packet_drip_and_write(self, p):
         buf = buffer_packet(p)
@@ -0,0 +1,23 @@
+import unittest
+
+from haka_mqtt.mqtt_request import MqttPublishTicket
+
+
+class TestMqttPublishTicket(unittest.TestCase):
+    def test_packet_follows_field_changes(self):
+        ticket = MqttPublishTicket(1, 'topic', b'payload', 1)
+        self.assertIs(ticket.packet(), ticket.packet())
+
+        ticket.topic = 'other'
+        ticket.payload = b'other'
+        ticket.qos = 2
+        ticket.retain = True
+        p = ticket.packet()
+        self.assertEqual('other', p.topic)
+        self.assertEqual(b'other', p.payload)
+        self.assertEqual(2, p.qos)
+        self.assertTrue(p.retain)
+        self.assertFalse(p.dupe)
+
+        ticket._set_dupe()
+        self.assertTrue(ticket.packet().dupe)
@@ -0,0 +1,32 @@
+import unittest
+
+from haka_mqtt.frontends.poll import MqttPollClient, MqttPollClientProperties
+from haka_mqtt.reactor import ReactorState
+
+
+class TestMqttPollClient(unittest.TestCase):
+    def setUp(self):
+        properties = MqttPollClientProperties()
+        properties.host = 'localhost'
+        properties.port = 1883
+        properties.ssl = False
+        self.client = MqttPollClient(properties, log=None)
+
+    def tearDown(self):
+        self.client._async_name_resolver.close()
+
+    def test_poll_none_inactive(self):
+        self.assertEqual(ReactorState.init, self.client.state)
+        self.client.poll(None)
+        self.assertEqual(ReactorState.init, self.client.state)
+
+    def test_poll_none_overdue_deadline(self):
+        self.client.start()
+        self.assertEqual(ReactorState.starting, self.client.state)
+
+        # Deadline is already past by the time select is called.
+        self.client._scheduler.remaining = lambda: -0.001
+        self.client._scheduler.add(0., self.client.stop)
+
+        self.client.poll(None)
+        self.assertEqual(ReactorState.stopped, self.client.state)
@@ -1,6 +1,7 @@
 from __future__ import print_function
 
 import errno
+import logging
 import os
 import ssl
 import unittest
@@ -26,7 +27,8 @@ from haka_mqtt.mqtt_request import MqttPublishTicket, MqttPublishStatus, MqttSub
 from haka_mqtt.reactor import (
     ReactorState,
     ConnectReactorError, INACTIVE_STATES, SocketReactorError, AddressReactorError, DecodeReactorError,
-    ProtocolReactorError, SocketState, MqttState, SslReactorError)
+    ProtocolReactorError, SocketState, MqttState, SslReactorError, RECV_BUF_SIZE,
+    RECV_DRAIN_LIMIT)
 from tests.reactor_harness import TestReactor, buffer_packet, socket_error
 
 
@@ -205,6 +207,47 @@ class TestReactorPaths(TestReactor, unittest.TestCase):
         self.assertEqual(ReactorState.error, self.reactor.state)
         self.assertTrue(isinstance(self.reactor.error, DecodeReactorError))
 
+    def test_recv_log_formatted_later(self):
+        self.start_to_connected()
+
+        class RecordListHandler(logging.Handler):
+            def __init__(self):
+                logging.Handler.__init__(self)
+                self.records = []
+
+            def emit(self, record):
+                self.records.append(record)
+
+        handler = RecordListHandler()
+        log = logging.getLogger('haka')
+        log.addHandler(handler)
+        try:
+            self.recv_packet_then_ewouldblock(MqttPingresp())
+            # First byte of a publish header is written over the start
+            # of the receive buffer.
+            self.set_recv_side_effect([b'\x30'])
+            self.reactor.read()
+        finally:
+            log.removeHandler(handler)
+
+        # Records formatted after the receive buffer has been reused
+        # still show the bytes that were received.
+        msgs = [r.getMessage() for r in handler.records if r.getMessage().startswith('recv')]
+        self.assertEqual(['recv 2 bytes 0xd000', 'recv 1 bytes 0x30'], msgs)
+
+        # Immediate shut-down.
+        self.reactor.terminate()
+
+    def test_recv_non_minimal_remaining_len(self):
+        self.start_to_connected()
+
+        # Pingresp with remaining length zero encoded in two bytes
+        # (0x80 0x00) instead of one.
+        self.set_recv_side_effect([b'\xd0\x80\x00'])
+        self.reactor.read()
+        self.assertEqual(ReactorState.error, self.reactor.state)
+        self.assertTrue(isinstance(self.reactor.error, DecodeReactorError))
+
 
 class TestPacketsBeforeConnack(TestReactor, unittest.TestCase):
     def setUp(self):
@@ -957,6 +1000,136 @@ class TestReceivePathQos0(TestReactor, unittest.TestCase):
         # Immediate shut-down.
         self.reactor.terminate()
 
+    def test_recv_publish_split_across_reads(self):
+        self.start_to_connected()
+
+        topics = [MqttTopic('bear_topic', 0)]
+        self.subscribe_and_suback(topics)
+
+        # Receive QoS=0 publish in two pieces followed by a second
+        # publish in the same read as the tail of the first.
+        publish0 = MqttPublish(0, topics[0].name, b'incoming0', False, topics[0].max_qos, False)
+        publish1 = MqttPublish(0, topics[0].name, b'incoming1', False, topics[0].max_qos, False)
+        buf0 = buffer_packet(publish0)
+        buf1 = buffer_packet(publish1)
+
+        self.set_recv_side_effect([buf0[0:4]])
+        self.reactor.read()
+        self.on_publish.assert_not_called()
+
+        self.set_recv_side_effect([buf0[4:] + buf1])
+        self.reactor.read()
+        self.assertEqual(2, self.on_publish.call_count)
+        self.assertEqual(publish0, self.on_publish.call_args_list[0][0][1])
+        self.assertEqual(publish1, self.on_publish.call_args_list[1][0][1])
+        self.assertFalse(self.reactor.want_write())
+        self.socket.send.assert_not_called()
+
+        # Immediate shut-down.
+        self.reactor.terminate()
+
+    def test_recv_publish_larger_than_recv_buf(self):
+        self.start_to_connected()
+
+        topics = [MqttTopic('bear_topic', 0)]
+        self.subscribe_and_suback(topics)
+
+        # Receive QoS=0 publish larger than the initial receive buffer;
+        # the buffer must grow to hold the whole packet.
+        publish = MqttPublish(0, topics[0].name, b'x' * (RECV_BUF_SIZE + 1024), False, topics[0].max_qos, False)
+        buf = buffer_packet(publish)
+
+        self.set_recv_side_effect([buf[0:RECV_BUF_SIZE // 2]])
+        self.reactor.read()
+        self.on_publish.assert_not_called()
+
+        self.socket.recv_into.reset_mock()
+        self.set_recv_side_effect([buf[RECV_BUF_SIZE // 2:], socket_error(errno.EWOULDBLOCK)])
+        self.reactor.read()
+        self.on_publish.assert_called_once_with(self.reactor, publish)
+        # The first recv_into filled the buffer, which then grew to
+        # exactly the packet size; the second recv_into filled that
+        # too so the reactor tried once more to drain the socket.
+        self.assertEqual(3, self.socket.recv_into.call_count)
+
+        # Immediate shut-down.
+        self.reactor.terminate()
+
+    def test_recv_oversized_remaining_len(self):
+        self.start_to_connected()
+
+        # Publish header claiming the maximum remaining length of
+        # 268435455 bytes.
+        self.set_recv_side_effect([b'\x30\xff\xff\xff\x7f', socket_error(errno.EWOULDBLOCK)])
+        self.reactor.read()
+        self.socket.recv_into.reset_mock()
+
+        # The receive buffer only grows as bytes actually arrive.
+        self.set_recv_side_effect([socket_error(errno.EWOULDBLOCK)])
+        self.reactor.read()
+        self.assertEqual(RECV_BUF_SIZE - 5, len(self.socket.recv_into.call_args[0][0]))
+        self.socket.recv_into.reset_mock()
+
+        self.set_recv_side_effect([b'\x00' * (RECV_BUF_SIZE - 5), socket_error(errno.EWOULDBLOCK)])
+        self.reactor.read()
+        self.assertEqual(RECV_BUF_SIZE, len(self.socket.recv_into.call_args[0][0]))
+        self.on_publish.assert_not_called()
+        self.assertEqual(ReactorState.started, self.reactor.state)
+
+        # Immediate shut-down.
+        self.reactor.terminate()
+
+    def test_recv_drain_limit(self):
+        self.start_to_connected()
+
+        topics = [MqttTopic('bear_topic', 0)]
+        self.subscribe_and_suback(topics)
+
+        # A publish that exactly fills the receive buffer; the fixed
+        # header is 4 bytes and the topic has a 2 byte length prefix.
+        payload_len = RECV_BUF_SIZE - 4 - 2 - len(topics[0].name)
+        publish = MqttPublish(0, topics[0].name, b'x' * payload_len, False, topics[0].max_qos, False)
+        buf = buffer_packet(publish)
+        self.assertEqual(RECV_BUF_SIZE, len(buf))
+
+        # Every recv_into call fills the buffer; read stops after
+        # RECV_DRAIN_LIMIT calls.
+        self.socket.recv_into.reset_mock()
+        self.set_recv_side_effect([buf] * (RECV_DRAIN_LIMIT + 1) + [socket_error(errno.EWOULDBLOCK)])
+        self.assertEqual(RECV_DRAIN_LIMIT * len(buf), self.reactor.read())
+        self.assertEqual(RECV_DRAIN_LIMIT, self.socket.recv_into.call_count)
+        self.assertEqual(RECV_DRAIN_LIMIT, self.on_publish.call_count)
+
+        self.assertEqual(len(buf), self.reactor.read())
+        self.assertEqual(RECV_DRAIN_LIMIT + 2, self.socket.recv_into.call_count)
+        self.assertEqual(RECV_DRAIN_LIMIT + 1, self.on_publish.call_count)
+
+        # Immediate shut-down.
+        self.reactor.terminate()
+
+    def test_recv_blocking_socket_reads_once(self):
+        self.start_to_connected()
+
+        topics = [MqttTopic('bear_topic', 0)]
+        self.subscribe_and_suback(topics)
+
+        payload_len = RECV_BUF_SIZE - 4 - 2 - len(topics[0].name)
+        publish = MqttPublish(0, topics[0].name, b'x' * payload_len, False, topics[0].max_qos, False)
+        buf = buffer_packet(publish)
+        self.assertEqual(RECV_BUF_SIZE, len(buf))
+
+        # A socket with a timeout would block on a second recv_into so
+        # read stops after one call even though it filled the buffer.
+        self.socket.gettimeout.return_value = 5.
+        self.socket.recv_into.reset_mock()
+        self.set_recv_side_effect([buf, buf])
+        self.assertEqual(len(buf), self.reactor.read())
+        self.socket.recv_into.assert_called_once()
+        self.on_publish.assert_called_once_with(self.reactor, publish)
+
+        # Immediate shut-down.
+        self.reactor.terminate()
+
     def test_mute_recv_publish(self):
         self.start_to_connected()
         self.reactor.stop()
@@ -1144,7 +1317,7 @@ class TestReactorStart(TestReactor, unittest.TestCase):
         self.reactor.write()
         self.socket.getsockopt.assert_called_once()
         self.socket.send.assert_not_called()
-        self.socket.recv.assert_not_called()
+        self.socket.recv_into.assert_not_called()
         self.socket.reset_mock()
 
         self.handshake_to_connected()
@@ -1160,7 +1333,7 @@ class TestReactorStart(TestReactor, unittest.TestCase):
         self.reactor.write()
         self.socket.getsockopt.assert_called_once()
         self.socket.send.assert_not_called()
-        self.socket.recv.assert_not_called()
+        self.socket.recv_into.assert_not_called()
         self.socket.reset_mock()
 
         self.assertEqual(ReactorState.error, self.reactor.state)